@@ -0,0 +1,62 @@
+"""Shared fixtures for the trajectory test suite."""
+
+import json
+
+import pytest
+
+
+def _user(text, timestamp):
+    return {
+        "type": "user",
+        "cwd": "/work/app",
+        "gitBranch": "main",
+        "timestamp": timestamp,
+        "message": {"role": "user", "content": text},
+    }
+
+
+def _assistant(content, timestamp):
+    return {
+        "type": "assistant",
+        "timestamp": timestamp,
+        "message": {"role": "assistant", "content": content},
+    }
+
+
+SESSION_ENTRIES = [
+    {"type": "summary", "summary": "Login form"},
+    _user("Add a login form with email and password fields", "2026-01-01T10:00:00Z"),
+    _assistant([
+        {"type": "text", "text": "I'll look at the existing views first."},
+        {"type": "tool_use", "id": "t1", "name": "Read",
+         "input": {"file_path": "/work/app/views.py"}},
+    ], "2026-01-01T10:00:05Z"),
+    _assistant([
+        {"type": "tool_use", "id": "t2", "name": "Write",
+         "input": {"file_path": "/work/app/login.py", "content": "def login():\n    pass\n"}},
+    ], "2026-01-01T10:00:10Z"),
+    _user("ok", "2026-01-01T10:01:00Z"),
+    _user([{"type": "text", "text": "<command-name>/clear</command-name>"}],
+          "2026-01-01T10:01:30Z"),
+    _assistant([
+        {"type": "tool_use", "id": "t3", "name": "Bash",
+         "input": {"command": "git status"}},
+        {"type": "tool_use", "id": "t4", "name": "Edit",
+         "input": {"file_path": "/work/app/login.py",
+                   "old_string": "pass", "new_string": "return check()"}},
+    ], "2026-01-01T10:02:00Z"),
+    _assistant("not a block list", "2026-01-01T10:02:30Z"),
+    _user("  Use bcrypt for the password hash instead of sha256  ", "2026-01-01T10:03:00Z"),
+    _assistant([{"type": "text", "text": "Switching to bcrypt."}], "2026-01-01T10:03:05Z"),
+]
+
+
+@pytest.fixture
+def session_file(tmp_path):
+    """A small session .jsonl file with prompts, noise and file changes."""
+    path = tmp_path / "3f2a9c1e-0000-4000-8000-000000000000.jsonl"
+    path.write_text(
+        "\n".join(json.dumps(entry) for entry in SESSION_ENTRIES) + "\n",
+        encoding="utf-8",
+    )
+    return path
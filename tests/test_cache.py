@@ -0,0 +1,91 @@
+"""Tests for the on-disk analysis cache."""
+
+import os
+import time
+
+import pytest
+
+from trajectory import _cache
+from trajectory.models import AnalysisResult
+
+
+@pytest.fixture(autouse=True)
+def cache_home(tmp_path, monkeypatch):
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    return tmp_path / "cache"
+
+
+def _result(intent="Add a login form"):
+    return AnalysisResult(
+        intent=intent,
+        decisions=[{"what": "Use bcrypt"}],
+        rejected=[],
+        assumptions=[],
+        deferred=[],
+    )
+
+
+def _age(path, seconds):
+    old = time.time() - seconds
+    os.utime(path, (old, old))
+
+
+def test_round_trip(session_file):
+    key = _cache.session_key(session_file, "model", "std")
+
+    assert _cache.get(key) is None
+    _cache.put(key, _result())
+    assert _cache.get(key) == _result()
+
+
+def test_key_depends_on_settings(session_file):
+    key = _cache.session_key(session_file, "model", "std")
+
+    assert _cache.session_key(session_file, "model", "std") == key
+    assert _cache.session_key(session_file, "other", "std") != key
+    assert _cache.session_key(session_file, "model", "flow") != key
+    assert _cache.session_key(session_file, "model", "std", 4000) != key
+
+
+def test_key_changes_with_content(session_file):
+    key = _cache.session_key(session_file, "model", "std")
+    _cache.put(key, _result())
+
+    with open(session_file, "a", encoding="utf-8") as f:
+        f.write('{"type": "user", "message": {"content": "Also add logout"}}\n')
+
+    new_key = _cache.session_key(session_file, "model", "std")
+    assert new_key != key
+    assert _cache.get(new_key) is None
+
+
+def test_expired_entry_is_removed(session_file, cache_home):
+    key = _cache.session_key(session_file, "model", "std")
+    _cache.put(key, _result())
+    path = cache_home / "trajectory" / f"{key}.json"
+    _age(path, _cache.CACHE_TTL + 60)
+
+    assert _cache.get(key) is None
+    assert not path.exists()
+
+
+def test_put_prunes_expired_files(session_file, cache_home):
+    stale_key = _cache.session_key(session_file, "model", "std")
+    _cache.put(stale_key, _result())
+    cache_dir = cache_home / "trajectory"
+    stale = [cache_dir / f"{stale_key}.json", *(cache_dir / "stamps").iterdir()]
+    for path in stale:
+        _age(path, _cache.CACHE_TTL + 60)
+
+    _cache.put("fresh", _result("Fresh"))
+
+    assert not any(path.exists() for path in stale)
+    assert _cache.get("fresh") == _result("Fresh")
+
+
+def test_corrupt_entry_is_a_miss(cache_home):
+    path = cache_home / "trajectory" / "broken.json"
+    path.parent.mkdir(parents=True)
+    path.write_text("{not json", encoding="utf-8")
+
+    assert _cache.get("broken") is None
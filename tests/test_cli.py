@@ -0,0 +1,62 @@
+"""Tests for command-line parsing."""
+
+import pytest
+
+from trajectory.cli import _build_parser, _parse_args_fast
+
+
+@pytest.mark.parametrize("argv", [
+    ["gen"],
+    ["gen", "--flow"],
+    ["gen", "--audit", "--copy"],
+    ["gen", "--flow-and-md", "--no-cache"],
+    ["gen", "-s", "17c072d8"],
+    ["gen", "--session", "17c072d8", "-p", "/work/app"],
+    ["gen", "--session=17c072d8", "--project=/work/app"],
+    ["gen", "-o", "out.md", "--output", "other.md"],
+    ["gen", "--model", "claude-opus-4-20250514"],
+    ["gen", "--max-input-tokens", "4000"],
+    ["gen", "--max-input-tokens=4000", "--flow"],
+    ["list"],
+    ["list", "-p", "/work/app"],
+    ["list", "--project=/work/app"],
+    ["help"],
+])
+def test_fast_parse_matches_argparse(argv):
+    fast = _parse_args_fast(argv)
+    assert fast is not None
+    assert vars(fast) == vars(_build_parser().parse_args(argv))
+
+
+@pytest.mark.parametrize("argv", [
+    [],
+    ["--help"],
+    ["gen", "--help"],
+    ["gen", "--flo"],
+    ["gen", "--unknown"],
+    ["gen", "-s"],
+    ["gen", "-s", "--flow"],
+    ["gen", "--flow=yes"],
+    ["gen", "--max-input-tokens", "0"],
+    ["gen", "--max-input-tokens", "many"],
+    ["gen", "extra"],
+    ["bogus"],
+])
+def test_fast_parse_defers_to_argparse(argv):
+    assert _parse_args_fast(argv) is None
+
+
+def test_gen_options_cover_argparse():
+    parser = _build_parser()
+    gen = parser._subparsers._group_actions[0].choices["gen"]
+    option_strings = {
+        option
+        for action in gen._actions
+        for option in action.option_strings
+        if option not in ("-h", "--help")
+    }
+    for option in option_strings:
+        argv = ["gen", option] if gen._option_string_actions[option].nargs == 0 else [
+            "gen", option, "1"
+        ]
+        assert _parse_args_fast(argv) is not None, option
@@ -0,0 +1,40 @@
+"""Tests for transcript noise filters."""
+
+import pytest
+
+from trajectory.filters import NOISE_PHRASES, could_be_noise_message, is_noise_message
+
+SAMPLES = sorted(NOISE_PHRASES) + [phrase.upper() for phrase in NOISE_PHRASES] + [
+    "",
+    " ",
+    "ok ",
+    "  sounds good\n",
+    "\tthanks",
+    "<task-notification>done</task-notification>",
+    "<command-name>/clear</command-name>",
+    "  <Command-name>/clear</command-name>",
+    "<TASK-NOTIFICATION>",
+    "<div>markup</div>",
+    "Add a login form",
+    "Use bcrypt for the password hash instead of sha256",
+    "okay, but rename the module first",
+    "yes please go ahead and refactor the parser",
+    "x" * 200,
+]
+
+
+@pytest.mark.parametrize("text", SAMPLES)
+def test_noise_implies_could_be_noise(text):
+    if is_noise_message(text):
+        assert could_be_noise_message(text)
+
+
+def test_screen_passes_all_noise_phrases():
+    for phrase in NOISE_PHRASES:
+        assert is_noise_message(phrase)
+        assert could_be_noise_message(phrase)
+
+
+def test_real_prompts_are_not_noise():
+    assert not is_noise_message("Add a login form")
+    assert not could_be_noise_message("Use bcrypt for the password hash instead of sha256")
@@ -0,0 +1,41 @@
+"""Tests for session parsing and transcript building."""
+
+import pytest
+
+from trajectory.parser import (
+    build_transcript,
+    changed_files,
+    parse_session,
+    stream_transcript,
+)
+
+
+@pytest.mark.parametrize("code_focused", [True, False])
+def test_stream_transcript_matches_build_transcript(session_file, code_focused):
+    expected = build_transcript(parse_session(session_file), code_focused=code_focused)
+    assert stream_transcript(session_file, code_focused=code_focused) == expected
+
+
+@pytest.mark.parametrize("max_length", [1, 40, 120, 300])
+def test_stream_transcript_matches_when_truncated(session_file, max_length):
+    expected = build_transcript(parse_session(session_file), max_length=max_length)
+    assert stream_transcript(session_file, max_length=max_length) == expected
+
+
+def test_parse_session(session_file):
+    data = parse_session(session_file)
+
+    assert data.session_id == session_file.stem
+    assert data.project_path == "/work/app"
+    assert data.git_branch == "main"
+    assert data.start_time == "2026-01-01T10:00:00Z"
+    assert data.end_time == "2026-01-01T10:03:05Z"
+    assert len(data.file_changes) == 2
+    assert data.files_changed == {"login.py": {"edits": 1, "created": True}}
+
+
+def test_changed_files_falls_back_to_file_changes(session_file):
+    data = parse_session(session_file)
+    data.files_changed = {}
+
+    assert changed_files(data) == {"login.py": {"edits": 1, "created": True}}
@@ -29,11 +29,14 @@ from .models import (
 )
 from .parser import (
     parse_session,
+    parse_sessions,
+    iter_entries,
     find_latest_session,
     list_sessions,
     build_transcript,
+    stream_transcript,
 )
-from .analyzer import analyze_session, analyze_session_for_flow
+from .analyzer import analyze_session, analyze_session_for_flow, analyze_session_and_flow
 from .renderer import render_decision_log, render_flow_diagram
 from .cli import main
 
@@ -46,12 +49,16 @@ __all__ = [
     "ConversationTurn",
     # Parser
     "parse_session",
+    "parse_sessions",
+    "iter_entries",
     "find_latest_session",
     "list_sessions",
     "build_transcript",
+    "stream_transcript",
     # Analyzer
     "analyze_session",
     "analyze_session_for_flow",
+    "analyze_session_and_flow",
     # Renderer
     "render_decision_log",
     "render_flow_diagram",
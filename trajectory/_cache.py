@@ -0,0 +1,120 @@
+"""On-disk cache of analysis results, keyed by session content."""
+
+import hashlib
+import json
+import os
+import time
+from dataclasses import asdict
+from pathlib import Path
+from typing import Optional
+
+from . import __version__
+from .models import AnalysisResult
+
+# Cached analyses older than this are ignored (seconds)
+CACHE_TTL = 7 * 24 * 60 * 60
+
+
+def get_cache_dir() -> Path:
+    """Get the trajectory cache directory."""
+    base = os.environ.get("XDG_CACHE_HOME")
+    return (Path(base) if base else Path.home() / ".cache") / "trajectory"
+
+
+def session_key(
+    session_path: Path,
+    model: str,
+    kind: str,
+    max_input_tokens: Optional[int] = None
+) -> str:
+    """Build the cache key for analyzing a session file.
+
+    Args:
+        session_path: Path to the .jsonl session file.
+        model: Claude model used for analysis.
+        kind: Analysis flavour ("std" or "flow").
+        max_input_tokens: Transcript budget the analysis was run with.
+
+    Returns:
+        Hex digest identifying the session content and analysis settings.
+    """
+    digest = _file_digest(session_path)
+    raw = f"{digest}:{model}:{kind}:{max_input_tokens}:{__version__}"
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+def get(key: str) -> Optional[AnalysisResult]:
+    """Return the cached analysis for a key, or None if missing or expired."""
+    path = get_cache_dir() / f"{key}.json"
+    try:
+        if time.time() - path.stat().st_mtime > CACHE_TTL:
+            path.unlink()
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            return AnalysisResult(**json.load(f))
+    except (OSError, ValueError, TypeError):
+        return None
+
+
+def put(key: str, result: AnalysisResult) -> None:
+    """Store an analysis result. Failures are ignored; the cache is best-effort.
+
+    Also deletes expired results and stale file stamps, so the cache
+    directory doesn't grow without bound.
+    """
+    cache_dir = get_cache_dir()
+    _write_json(cache_dir / f"{key}.json", asdict(result))
+    _prune(cache_dir)
+
+
+def _prune(cache_dir: Path) -> None:
+    """Delete cache files (results, stamps, leftover temp files) older than CACHE_TTL."""
+    cutoff = time.time() - CACHE_TTL
+    for directory in (cache_dir, cache_dir / "stamps"):
+        try:
+            with os.scandir(directory) as it:
+                for entry in it:
+                    if not entry.name.endswith((".json", ".tmp")):
+                        continue
+                    try:
+                        if entry.is_file() and entry.stat().st_mtime < cutoff:
+                            os.unlink(entry.path)
+                    except OSError:
+                        pass
+        except OSError:
+            pass
+
+
+def _file_digest(path: Path) -> str:
+    """SHA-256 of a file's content, reused while its mtime and size are unchanged."""
+    stat = path.stat()
+    path_id = hashlib.sha256(str(path.resolve()).encode()).hexdigest()
+    stamp_path = get_cache_dir() / "stamps" / f"{path_id}.json"
+
+    try:
+        with open(stamp_path, "r", encoding="utf-8") as f:
+            stamp = json.load(f)
+        if stamp["mtime_ns"] == stat.st_mtime_ns and stamp["size"] == stat.st_size:
+            return stamp["sha256"]
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+
+    digest = hashlib.sha256(path.read_bytes()).hexdigest()
+    _write_json(stamp_path, {
+        "mtime_ns": stat.st_mtime_ns,
+        "size": stat.st_size,
+        "sha256": digest,
+    })
+    return digest
+
+
+def _write_json(path: Path, payload: dict) -> None:
+    """Atomically write a JSON file, ignoring filesystem errors."""
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(payload, f)
+        os.replace(tmp_path, path)
+    except OSError:
+        pass
@@ -1,56 +1,85 @@
 """Analyze sessions using Claude API to extract decisions."""
 
 import json
+import logging
 import os
-import re
+import random
 import sys
+import threading
+import time
 from typing import Optional
 
+try:
+    from orjson import loads as _json_loads
+except ImportError:
+    _json_loads = json.loads
+
+from . import _cache
 from .models import SessionData, AnalysisResult
-from .parser import build_transcript
+from .parser import build_transcript, changed_files
 
-# Analysis prompt template
-ANALYSIS_PROMPT = '''Analyze this coding session and extract CODE DECISIONS for a PR review.
+logger = logging.getLogger(__name__)
+
+# Default transcript budget for analysis requests, in characters
+MAX_TRANSCRIPT_CHARS = 50000
+
+# Rough characters per token, for converting a token budget to characters
+CHARS_PER_TOKEN = 4
+
+# Shared system prompt for both analysis kinds
+SYSTEM_PROMPT = '''You analyze Claude Code session transcripts and record the decisions made
+while writing code.
 
-{files_summary}
+The user message starts with the files changed and the transcript of the session, followed by
+the instructions for this analysis.'''
+
+# Session content, identical for both analysis kinds. It is the prompt cache
+# breakpoint: with SYSTEM_PROMPT it forms a prefix that the standard and flow
+# requests for the same session share.
+SESSION_CONTEXT_PROMPT = '''{files_summary}
 
 Transcript (filtered to code-relevant discussion):
-{transcript}
+{transcript}'''
+
+# Analysis instructions, sent after the session content
+ANALYSIS_PROMPT = '''Analyze this coding session and extract CODE DECISIONS for a PR review.
+
+The files changed and the transcript are provided above.
 
 Respond in this exact JSON format:
-{{
+{
   "intent": "What feature/fix/change was being implemented (1-2 sentences, focus on the WHAT and WHY)",
   "decisions": [
-    {{
+    {
       "decision": "What was decided",
       "reasoning": "Why this choice was made",
       "provenance": "explicit|chosen|inferred",
       "context": "Readable summary of how this decision came about"
-    }}
+    }
   ],
   "rejected": [
-    {{
+    {
       "alternative": "What was considered but not chosen",
       "reason": "Why it was rejected",
       "provenance": "explicit|chosen",
       "context": "Summary of the discussion"
-    }}
+    }
   ],
   "assumptions": [
-    {{
+    {
       "assumption": "What was taken for granted",
       "provenance": "explicit|inferred",
       "context": "How this assumption surfaced"
-    }}
+    }
   ],
   "deferred": [
-    {{
+    {
       "item": "What was explicitly pushed to later",
       "provenance": "explicit",
       "context": "Summary of why it was deferred"
-    }}
+    }
   ]
-}}
+}
 
 CONTEXT FIELD - Make it readable for someone reviewing later:
 - For [chosen]: "Selected from options: X / Y / Z" - list what the alternatives were
@@ -73,13 +102,74 @@ NO INTERPRETATION. Only record what happened. Do not add risks, suggestions, or
 
 Aim for 3-6 decisions, 0-2 rejected (only if actually discussed), 1-3 assumptions, 0-2 deferred (only if explicit).'''
 
+def _split_template(template: str) -> tuple:
+    """Split a user prompt template around its {files_summary} and {transcript} slots."""
+    prefix, rest = template.split("{files_summary}")
+    mid, suffix = rest.split("{transcript}")
+    return prefix, mid, suffix
+
+
+def _fill_template(parts: tuple, files_summary: str, transcript: str) -> str:
+    """Fill a template split by _split_template."""
+    prefix, mid, suffix = parts
+    return "".join((prefix, files_summary, mid, transcript, suffix))
+
+
+_SESSION_CONTEXT_PARTS = _split_template(SESSION_CONTEXT_PROMPT)
+
+
+# The anthropic module, bound on first use by _load_anthropic()
+_anthropic = None
+
+# Client shared by all requests, and the API key it was created with
+_client = None
+_client_api_key = None
+
+
+def _load_anthropic():
+    """Import the anthropic SDK once and return it, or None if not installed.
+
+    The import is deferred so that `import trajectory` and CLI startup don't
+    pay for it.
+    """
+    global _anthropic
+    if _anthropic is None:
+        try:
+            import anthropic
+        except ImportError:
+            return None
+        _anthropic = anthropic
+    return _anthropic
 
-def analyze_session(data: SessionData, model: str = "claude-sonnet-4-20250514") -> Optional[AnalysisResult]:
+
+def preload_anthropic() -> None:
+    """Import the anthropic SDK ahead of the first request.
+
+    The import is a large share of the time before the first API call, so the
+    CLI runs this in a background thread while the session is being parsed.
+    """
+    _load_anthropic()
+
+
+def analyze_session(
+    data: SessionData,
+    model: str = "claude-sonnet-4-20250514",
+    cache_key: Optional[str] = None,
+    max_input_tokens: Optional[int] = None,
+    refresh: bool = False
+) -> Optional[AnalysisResult]:
     """Use Claude API to analyze the session and extract decisions.
 
     Args:
         data: Parsed session data.
         model: Claude model to use for analysis.
+        cache_key: Optional on-disk cache key (see _cache.session_key). When
+            given, a cached result is returned without calling the API and
+            fresh results are stored.
+        max_input_tokens: Approximate token budget for the transcript. Longer
+            transcripts keep their beginning and end and drop the middle.
+        refresh: If True, skip the cache lookup but still store the fresh
+            result under cache_key.
 
     Returns:
         AnalysisResult with extracted decisions, or None on error.
@@ -87,105 +177,85 @@ def analyze_session(data: SessionData, model: str = "claude-sonnet-4-20250514")
     Requires:
         ANTHROPIC_API_KEY environment variable.
     """
-    try:
-        import anthropic
-    except ImportError:
-        print("Error: anthropic package not installed. Run: pip install anthropic", file=sys.stderr)
-        return None
+    cached = None if refresh else _get_cached(cache_key)
+    if cached:
+        return cached
 
-    api_key = os.environ.get("ANTHROPIC_API_KEY")
-    if not api_key:
-        print("Error: ANTHROPIC_API_KEY environment variable not set", file=sys.stderr)
+    client = _client_from_env()
+    if client is None:
         return None
 
-    client = anthropic.Anthropic(api_key=api_key)
-
     # Build context
-    transcript = build_transcript(data, code_focused=True)
-    files_summary = _build_files_summary(data)
+    files_summary, transcript = _build_context(data, max_input_tokens)
 
-    prompt = ANALYSIS_PROMPT.format(
-        files_summary=files_summary,
-        transcript=transcript
-    )
+    print("Analyzing session with Claude...", file=sys.stderr)
+    return _run_analysis(client, model, "std", files_summary, transcript, cache_key)
 
-    try:
-        print("Analyzing session with Claude...", file=sys.stderr)
-        response = client.messages.create(
-            model=model,
-            max_tokens=2000,
-            messages=[{"role": "user", "content": prompt}]
-        )
 
-        response_text = response.content[0].text
-        return _parse_analysis_response(response_text)
+def _build_context(data: SessionData, max_input_tokens: Optional[int] = None) -> tuple:
+    """Build the files summary and transcript sent with an analysis request."""
+    if max_input_tokens is None:
+        max_chars = MAX_TRANSCRIPT_CHARS
+    elif max_input_tokens < 1:
+        raise ValueError(f"max_input_tokens must be positive, got {max_input_tokens}")
+    else:
+        max_chars = max_input_tokens * CHARS_PER_TOKEN
 
-    except Exception as e:
-        print(f"Error during analysis: {e}", file=sys.stderr)
-        return None
+    transcript = build_transcript(data, max_length=sys.maxsize, code_focused=True)
+    return _build_files_summary(data), _truncate_transcript(transcript, max_chars)
+
+
+def _truncate_transcript(transcript: str, max_chars: int) -> str:
+    """Keep the head and tail of a long transcript, eliding the middle."""
+    if len(transcript) <= max_chars:
+        return transcript
+
+    head = max_chars // 2
+    tail = max_chars - head
+    omitted = len(transcript) - head - tail
+    return f"{transcript[:head]}\n...[truncated {omitted} chars]...\n{transcript[-tail:]}"
 
 
 def _build_files_summary(data: SessionData) -> str:
     """Build a summary of files changed in the session."""
-    if not data.file_changes:
+    files_changed = changed_files(data)
+    if not files_changed:
         return ""
 
-    files_changed = {}
-    for change in data.file_changes:
-        rel_path = _relativize_path(change.file_path, data.project_path)
-        if rel_path not in files_changed:
-            files_changed[rel_path] = {"edits": 0, "created": False}
-        if change.change_type == "create":
-            files_changed[rel_path]["created"] = True
-        else:
-            files_changed[rel_path]["edits"] += 1
-
-    files_list = []
-    for path, info in files_changed.items():
-        if info["created"]:
-            files_list.append(f"- {path} (created)")
-        else:
-            files_list.append(f"- {path} ({info['edits']} edits)")
+    files_list = [
+        f"- {path} (created)" if info["created"] else f"- {path} ({info['edits']} edits)"
+        for path, info in files_changed.items()
+    ]
 
     return "Files changed:\n" + "\n".join(files_list)
 
 
-def _relativize_path(file_path: str, project_path: str) -> str:
-    """Make file path relative to project."""
-    if project_path and file_path.startswith(project_path):
-        return file_path[len(project_path):].lstrip("/")
-    return file_path
-
-
-# Flow-specific analysis prompt
+# Flow-specific analysis instructions, sent after the session content
 FLOW_ANALYSIS_PROMPT = '''Analyze this coding session to create a DECISION FLOW visualization.
 
-{files_summary}
-
-Transcript:
-{transcript}
+The files changed and the transcript are provided above.
 
 Extract the decision sequence as a FLOW. Respond in this exact JSON format:
-{{
+{
   "intent": "What user wanted to accomplish (max 35 chars)",
   "decisions": [
-    {{
+    {
       "decision": "Short statement (max 35 chars)",
       "type": "directive|choice|implement",
       "context": "For choice: list options. For directive: why (optional)"
-    }}
+    }
   ],
   "rejected": [
-    {{
+    {
       "alternative": "What was not chosen (max 35 chars)"
-    }}
+    }
   ],
   "deferred": [
-    {{
+    {
       "item": "What was pushed to later (max 30 chars)"
-    }}
+    }
   ]
-}}
+}
 
 DECISION TYPES:
 - "directive": User explicitly requested this action
@@ -200,8 +270,13 @@ RULES:
 - Aim for 2-4 decisions, 0-2 rejected, 0-1 deferred
 - NO assumptions section needed'''
 
-
-def analyze_session_for_flow(data: SessionData, model: str = "claude-sonnet-4-20250514") -> Optional[AnalysisResult]:
+def analyze_session_for_flow(
+    data: SessionData,
+    model: str = "claude-sonnet-4-20250514",
+    cache_key: Optional[str] = None,
+    max_input_tokens: Optional[int] = None,
+    refresh: bool = False
+) -> Optional[AnalysisResult]:
     """Use Claude API to analyze the session specifically for flow visualization.
 
     Uses a different prompt optimized for sequential decision flow.
@@ -209,6 +284,13 @@ def analyze_session_for_flow(data: SessionData, model: str = "claude-sonnet-4-20
     Args:
         data: Parsed session data.
         model: Claude model to use for analysis.
+        cache_key: Optional on-disk cache key (see _cache.session_key). When
+            given, a cached result is returned without calling the API and
+            fresh results are stored.
+        max_input_tokens: Approximate token budget for the transcript. Longer
+            transcripts keep their beginning and end and drop the middle.
+        refresh: If True, skip the cache lookup but still store the fresh
+            result under cache_key.
 
     Returns:
         AnalysisResult with extracted decisions, or None on error.
@@ -216,52 +298,305 @@ def analyze_session_for_flow(data: SessionData, model: str = "claude-sonnet-4-20
     Requires:
         ANTHROPIC_API_KEY environment variable.
     """
-    try:
-        import anthropic
-    except ImportError:
-        print("Error: anthropic package not installed. Run: pip install anthropic", file=sys.stderr)
+    cached = None if refresh else _get_cached(cache_key)
+    if cached:
+        return cached
+
+    client = _client_from_env()
+    if client is None:
+        return None
+
+    # Build context
+    files_summary, transcript = _build_context(data, max_input_tokens)
+
+    print("Analyzing session for flow visualization...", file=sys.stderr)
+    return _run_analysis(client, model, "flow", files_summary, transcript, cache_key)
+
+
+def analyze_session_and_flow(
+    data: SessionData,
+    model: str = "claude-sonnet-4-20250514",
+    cache_key: Optional[str] = None,
+    flow_cache_key: Optional[str] = None,
+    max_input_tokens: Optional[int] = None,
+    refresh: bool = False
+) -> tuple:
+    """Run the standard and flow analyses together.
+
+    The transcript is built once and both API requests overlap, so producing
+    both outputs costs little more than one round-trip. The second request
+    is sent once the first response has started, when the shared prompt
+    prefix is in the API's prompt cache and can be read back.
+
+    Args:
+        data: Parsed session data.
+        model: Claude model to use for analysis.
+        cache_key: Optional cache key for the standard analysis.
+        flow_cache_key: Optional cache key for the flow analysis.
+        max_input_tokens: Approximate token budget for the transcript.
+        refresh: If True, skip the cache lookups but still store fresh results.
+
+    Returns:
+        Tuple of (analysis, flow_analysis); either may be None on error.
+
+    Requires:
+        ANTHROPIC_API_KEY environment variable.
+    """
+    if refresh:
+        results = {"std": None, "flow": None}
+    else:
+        results = {"std": _get_cached(cache_key), "flow": _get_cached(flow_cache_key)}
+    cache_keys = {"std": cache_key, "flow": flow_cache_key}
+    pending = [kind for kind, result in results.items() if result is None]
+    if not pending:
+        return results["std"], results["flow"]
+
+    client = _client_from_env()
+    if client is None:
+        return results["std"], results["flow"]
+
+    # Build context once for both requests
+    files_summary, transcript = _build_context(data, max_input_tokens)
+
+    from concurrent.futures import ThreadPoolExecutor
+
+    print("Analyzing session with Claude (decision log + flow)...", file=sys.stderr)
+    first, *rest = pending
+    started = threading.Event()
+    with ThreadPoolExecutor(max_workers=len(pending)) as pool:
+        futures = {first: pool.submit(
+            _run_analysis, client, model, first, files_summary, transcript,
+            cache_keys[first], show_progress=False, started=started
+        )}
+        if rest:
+            started.wait()
+        for kind in rest:
+            futures[kind] = pool.submit(
+                _run_analysis, client, model, kind, files_summary, transcript,
+                cache_keys[kind], show_progress=False
+            )
+        for kind, future in futures.items():
+            results[kind] = future.result()
+
+    return results["std"], results["flow"]
+
+
+# Instructions and error label for each analysis kind
+_ANALYSES = {
+    "std": (ANALYSIS_PROMPT, "analysis"),
+    "flow": (FLOW_ANALYSIS_PROMPT, "flow analysis"),
+}
+
+
+def _get_cached(cache_key: Optional[str]) -> Optional[AnalysisResult]:
+    """Look up a cached analysis, if a cache key was given."""
+    if not cache_key:
         return None
 
+    cached = _cache.get(cache_key)
+    if cached:
+        print("Using cached analysis", file=sys.stderr)
+    return cached
+
+
+def _client_from_env():
+    """Get an Anthropic client for ANTHROPIC_API_KEY, or print why not and return None."""
+    # Check the key first: it is free, and the SDK import is not
     api_key = os.environ.get("ANTHROPIC_API_KEY")
     if not api_key:
         print("Error: ANTHROPIC_API_KEY environment variable not set", file=sys.stderr)
         return None
 
-    client = anthropic.Anthropic(api_key=api_key)
+    anthropic = _load_anthropic()
+    if anthropic is None:
+        print("Error: anthropic package not installed. Run: pip install anthropic", file=sys.stderr)
+        return None
 
-    # Build context
-    transcript = build_transcript(data, code_focused=True)
-    files_summary = _build_files_summary(data)
+    return _get_client(api_key)
 
-    prompt = FLOW_ANALYSIS_PROMPT.format(
-        files_summary=files_summary,
-        transcript=transcript
-    )
+
+def _get_client(api_key: str):
+    """Return the shared client for an API key, creating it on first use.
+
+    Reusing one client keeps its HTTP connection pool, so later requests in
+    the same process skip the TCP/TLS handshake.
+    """
+    global _client, _client_api_key
+    if _client is None or _client_api_key != api_key:
+        # Retries are handled by _create_message_with_retry, which also
+        # covers failures part-way through a streamed response
+        _client = _anthropic.Anthropic(api_key=api_key, max_retries=0)
+        _client_api_key = api_key
+    return _client
+
+
+def _run_analysis(
+    client,
+    model: str,
+    kind: str,
+    files_summary: str,
+    transcript: str,
+    cache_key: Optional[str],
+    show_progress: bool = True,
+    started: Optional[threading.Event] = None
+) -> Optional[AnalysisResult]:
+    """Request one analysis, parse it, and store it in the cache.
+
+    If given, started is set once the response begins streaming (or the
+    request fails), so another request can wait to share its prompt cache.
+    """
+    instructions, label = _ANALYSES[kind]
+    context = _fill_template(_SESSION_CONTEXT_PARTS, files_summary, transcript)
 
     try:
-        print("Analyzing session for flow visualization...", file=sys.stderr)
-        response = client.messages.create(
-            model=model,
-            max_tokens=2000,
-            messages=[{"role": "user", "content": prompt}]
+        response_text = _create_message_with_retry(
+            client, model, context, instructions, show_progress, started
         )
-
-        response_text = response.content[0].text
-        return _parse_analysis_response(response_text)
+        result = _parse_analysis_response(response_text)
+        if result and cache_key:
+            _cache.put(cache_key, result)
+        return result
 
     except Exception as e:
-        print(f"Error during flow analysis: {e}", file=sys.stderr)
+        print(f"Error during {label}: {e}", file=sys.stderr)
         return None
 
+    finally:
+        if started is not None:
+            started.set()
+
+
+# Attempts per analysis request when the API fails transiently
+MAX_ATTEMPTS = 3
+
+
+def _create_message_with_retry(
+    client,
+    model: str,
+    context: str,
+    instructions: str,
+    show_progress: bool = True,
+    started: Optional[threading.Event] = None
+) -> str:
+    """Call _create_message, retrying transient API errors with jittered backoff."""
+    for attempt in range(MAX_ATTEMPTS):
+        try:
+            return _create_message(
+                client, model, context, instructions, show_progress, started
+            )
+        except Exception as e:
+            if attempt == MAX_ATTEMPTS - 1 or not _is_transient_error(e):
+                raise
+            delay = min(2 ** attempt + random.random(), 10)
+            print(f"API request failed ({e}), retrying in {delay:.1f}s...", file=sys.stderr)
+            time.sleep(delay)
+
+
+# API error types worth retrying. An "error" event part-way through a stream
+# arrives on the stream's HTTP 200 response, so only its type tells us it
+# was an overload or server fault.
+_TRANSIENT_ERROR_TYPES = frozenset({"overloaded_error", "api_error", "rate_limit_error"})
+
+
+def _is_transient_error(error: Exception) -> bool:
+    """Whether an API error is worth retrying: connection problems, rate limits, overload."""
+    if isinstance(error, _anthropic.APIConnectionError):
+        return True
+    if isinstance(error, _anthropic.APIStatusError):
+        if error.status_code in (408, 409, 429) or error.status_code >= 500:
+            return True
+        return _error_type(error) in _TRANSIENT_ERROR_TYPES
+    return False
+
+
+def _error_type(error: Exception) -> Optional[str]:
+    """The API's error type (e.g. "overloaded_error") for an SDK exception, if known."""
+    error_type = getattr(error, "type", None)
+    if error_type:
+        return error_type
+
+    # Error bodies look like {"type": "error", "error": {"type": ..., "message": ...}}
+    body = getattr(error, "body", None)
+    if isinstance(body, dict):
+        inner = body.get("error")
+        if isinstance(inner, dict):
+            return inner.get("type")
+    return None
+
+
+# Streamed chunks between progress updates on stderr
+PROGRESS_EVERY = 20
+
+
+def _create_message(
+    client,
+    model: str,
+    context: str,
+    instructions: str,
+    show_progress: bool = True,
+    started: Optional[threading.Event] = None
+) -> str:
+    """Send one analysis request and return the response text.
+
+    The session context block is the prompt cache breakpoint: the system
+    prompt and context are the same for the standard and flow analyses of a
+    session, so whichever request runs second reads them from the cache and
+    only pays full price for its own instructions, which follow uncached.
+    The response is streamed so progress can be shown while it generates.
+    """
+    show_progress = show_progress and sys.stderr.isatty()
+    text_parts = []
+    received = 0
+
+    with client.messages.stream(
+        model=model,
+        max_tokens=2000,
+        system=SYSTEM_PROMPT,
+        messages=[{
+            "role": "user",
+            "content": [
+                {
+                    "type": "text",
+                    "text": context,
+                    "cache_control": {"type": "ephemeral"},
+                },
+                {"type": "text", "text": instructions},
+            ],
+        }]
+    ) as stream:
+        for i, chunk in enumerate(stream.text_stream, 1):
+            if i == 1 and started is not None:
+                started.set()  # the prompt has been processed and cached
+            text_parts.append(chunk)
+            received += len(chunk)
+            if show_progress and i % PROGRESS_EVERY == 0:
+                print(f"\r  received {received} chars", end="", file=sys.stderr, flush=True)
+        response = stream.get_final_message()
+
+    if show_progress and len(text_parts) >= PROGRESS_EVERY:
+        print(file=sys.stderr)
+
+    usage = getattr(response, "usage", None)
+    if usage is not None:
+        logger.debug(
+            "Prompt cache: %s tokens read, %s tokens written",
+            getattr(usage, "cache_read_input_tokens", None),
+            getattr(usage, "cache_creation_input_tokens", None),
+        )
+
+    return "".join(text_parts)
+
 
 def _parse_analysis_response(response_text: str) -> Optional[AnalysisResult]:
     """Parse the JSON response from Claude."""
-    json_match = re.search(r'\{[\s\S]*\}', response_text)
-    if not json_match:
+    # Take everything from the first "{" to the last "}" (the JSON object)
+    start = response_text.find("{")
+    end = response_text.rfind("}")
+    if start < 0 or end <= start:
         return None
 
     try:
-        result = json.loads(json_match.group())
+        result = _json_loads(response_text[start:end + 1])
         return AnalysisResult(
             intent=result.get("intent", ""),
             decisions=result.get("decisions", []),
@@ -269,5 +604,5 @@ def _parse_analysis_response(response_text: str) -> Optional[AnalysisResult]:
             assumptions=result.get("assumptions", []),
             deferred=result.get("deferred", [])
         )
-    except json.JSONDecodeError:
+    except json.JSONDecodeError:  # orjson.JSONDecodeError subclasses it
         return None
@@ -1,19 +1,176 @@
 """Command-line interface for trajectory."""
 
-import argparse
+import os
 import platform
+import shutil
 import subprocess
 import sys
 from datetime import datetime
 from pathlib import Path
+from types import SimpleNamespace
 
+from . import _cache
 from .parser import find_latest_session, list_sessions, parse_session, resolve_session
-from .analyzer import analyze_session, analyze_session_for_flow
+from .analyzer import (
+    analyze_session,
+    analyze_session_and_flow,
+    analyze_session_for_flow,
+    preload_anthropic,
+)
 from .renderer import render_decision_log, render_flow_diagram
 
+_SYSTEM = platform.system()
+
+
+def _find_clipboard_command():
+    """Pick the clipboard command for this system, or None if there isn't one.
+
+    Windows uses the Win32 API directly (see _copy_windows) instead.
+    """
+    if _SYSTEM == "Darwin":
+        return ("pbcopy",)
+    if _SYSTEM == "Windows":
+        return None
+    if shutil.which("xclip"):
+        return ("xclip", "-selection", "clipboard")
+    if shutil.which("xsel"):
+        return ("xsel", "--clipboard", "--input")
+    return None
+
+
+# Clipboard command, resolved once at import
+_CLIPBOARD_CMD = _find_clipboard_command()
+
+
+DEFAULT_MODEL = "claude-sonnet-4-20250514"
+
+
+def _positive_int(value: str) -> int:
+    """Convert an option value to an int, rejecting zero and negatives."""
+    number = int(value)
+    if number < 1:
+        raise ValueError(f"must be a positive integer: {value!r}")
+    return number
+
+
+# Options understood by the fast-path parser: flag -> (dest, type).
+# A type of None marks a store_true flag. Keep in sync with _build_parser().
+_GEN_OPTIONS = {
+    "-s": ("session", str),
+    "--session": ("session", str),
+    "-p": ("project", str),
+    "--project": ("project", str),
+    "-o": ("output", str),
+    "--output": ("output", str),
+    "--flow": ("flow", None),
+    "--audit": ("audit", None),
+    "--flow-and-md": ("flow_and_md", None),
+    "--copy": ("copy", None),
+    "--model": ("model", str),
+    "--max-input-tokens": ("max_input_tokens", _positive_int),
+    "--no-cache": ("no_cache", None),
+}
+
+_GEN_DEFAULTS = {
+    "session": None,
+    "project": None,
+    "output": None,
+    "flow": False,
+    "audit": False,
+    "flow_and_md": False,
+    "copy": False,
+    "model": DEFAULT_MODEL,
+    "max_input_tokens": None,
+    "no_cache": False,
+}
+
+_LIST_OPTIONS = {
+    "-p": ("project", str),
+    "--project": ("project", str),
+}
+
+_COMMANDS = {
+    "gen": (_GEN_OPTIONS, _GEN_DEFAULTS),
+    "list": (_LIST_OPTIONS, {"project": None}),
+    "help": ({}, {}),
+}
+
 
 def main() -> int:
     """Main entry point for the CLI."""
+    argv = sys.argv[1:]
+    args = _parse_args_fast(argv)
+    if args is None:
+        # Help, usage errors and unusual syntax go through argparse
+        parser = _build_parser()
+        args = parser.parse_args(argv)
+        if args.command is None:
+            parser.print_help()
+            return 0
+
+    # Handle subcommands
+    if args.command == "gen":
+        return cmd_gen(args)
+    elif args.command == "list":
+        return cmd_list(args)
+    else:
+        return cmd_help()
+
+
+def _parse_args_fast(argv: list):
+    """Parse a well-formed command line without importing argparse.
+
+    Handles plain `--flag`, `--option value`, `--option=value` and `-x value`
+    forms. Returns None for anything else (no command, --help, unknown or
+    abbreviated options, missing values) so the caller can fall back to the
+    full argparse parser and its messages.
+    """
+    if not argv or argv[0] not in _COMMANDS:
+        return None
+
+    options, defaults = _COMMANDS[argv[0]]
+    values = dict(defaults, command=argv[0])
+
+    args = iter(argv[1:])
+    for arg in args:
+        if arg.startswith("--"):
+            name, has_value, value = arg.partition("=")
+        else:
+            name, has_value, value = arg, "", ""
+
+        option = options.get(name)
+        if option is None:
+            return None
+        dest, value_type = option
+
+        if value_type is None:
+            if has_value:
+                return None
+            values[dest] = True
+            continue
+
+        if not has_value:
+            value = next(args, None)
+            if value is None or value.startswith("-"):
+                return None
+        try:
+            values[dest] = value_type(value)
+        except ValueError:
+            return None
+
+    return SimpleNamespace(**values)
+
+
+def _build_parser():
+    """Build the full argparse parser, used for help and error reporting."""
+    import argparse
+
+    def positive_int(value):
+        try:
+            return _positive_int(value)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"must be a positive integer: {value!r}")
+
     parser = argparse.ArgumentParser(
         prog="trajectory",
         description="Generate decision logs from Claude Code sessions",
@@ -69,6 +226,11 @@ Requires ANTHROPIC_API_KEY environment variable.
         action="store_true",
         help="Full output with provenance"
     )
+    gen_parser.add_argument(
+        "--flow-and-md",
+        action="store_true",
+        help="Write the markdown file and print the flow diagram in one run"
+    )
     gen_parser.add_argument(
         "--copy",
         action="store_true",
@@ -76,9 +238,20 @@ Requires ANTHROPIC_API_KEY environment variable.
     )
     gen_parser.add_argument(
         "--model",
-        default="claude-sonnet-4-20250514",
+        default=DEFAULT_MODEL,
         help="Claude model for analysis"
     )
+    gen_parser.add_argument(
+        "--max-input-tokens",
+        type=positive_int,
+        metavar="N",
+        help="Approximate token budget for the transcript sent to Claude"
+    )
+    gen_parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Ignore cached analysis and call the API (the result is still cached)"
+    )
 
     # list command
     list_parser = subparsers.add_parser(
@@ -92,23 +265,12 @@ Requires ANTHROPIC_API_KEY environment variable.
     )
 
     # help command
-    help_parser = subparsers.add_parser(
+    subparsers.add_parser(
         "help",
         help="Show detailed help"
     )
 
-    args = parser.parse_args()
-
-    # Handle subcommands
-    if args.command == "gen":
-        return cmd_gen(args)
-    elif args.command == "list":
-        return cmd_list(args)
-    elif args.command == "help":
-        return cmd_help()
-    else:
-        parser.print_help()
-        return 0
+    return parser
 
 
 def cmd_gen(args) -> int:
@@ -127,20 +289,85 @@ def cmd_gen(args) -> int:
         print("Use 'trajectory list' to see available sessions", file=sys.stderr)
         return 1
 
-    # Parse session
+    # Reuse a previous analysis of the same session content when possible.
+    # Keys are taken before parsing: a live session may grow while we read
+    # it, and results must be stored under the content that was analyzed.
+    if args.flow_and_md:
+        kinds = ("std", "flow")
+    elif args.flow:
+        kinds = ("flow",)
+    else:
+        kinds = ("std",)
+    cache_keys = {
+        kind: _cache.session_key(session_path, args.model, kind, args.max_input_tokens)
+        for kind in kinds
+    }
+
+    # --no-cache skips the lookup, but fresh results are still stored
+    results = dict.fromkeys(kinds)
+    if not args.no_cache:
+        for kind in kinds:
+            results[kind] = _cache.get(cache_keys[kind])
+    pending = [kind for kind in kinds if results[kind] is None]
+    if len(pending) < len(kinds):
+        print("Using cached analysis", file=sys.stderr)
+
+    # The API client library is only worth loading if a request will be made
+    needs_api = bool(pending) and bool(os.environ.get("ANTHROPIC_API_KEY"))
+
+    # Parse session, loading the API client library in parallel if needed
     print(f"Parsing session: {session_path.stem[:8]}", file=sys.stderr)
-    data = parse_session(session_path)
+    if needs_api:
+        from concurrent.futures import ThreadPoolExecutor
+
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            pool.submit(preload_anthropic)
+            data = parse_session(session_path)
+    else:
+        data = parse_session(session_path)
 
     print(f"Found {len(data.user_prompts)} prompts, {len(data.file_changes)} file changes", file=sys.stderr)
 
-    # Analyze
-    if args.flow:
+    # Analyze whatever wasn't cached (the lookups above are not repeated)
+    if len(pending) == 2:
+        results["std"], results["flow"] = analyze_session_and_flow(
+            data,
+            model=args.model,
+            cache_key=cache_keys["std"],
+            flow_cache_key=cache_keys["flow"],
+            max_input_tokens=args.max_input_tokens,
+            refresh=True
+        )
+    elif pending == ["flow"]:
         print("Analyzing for flow...", file=sys.stderr)
-        analysis = analyze_session_for_flow(data, model=args.model)
+        results["flow"] = analyze_session_for_flow(
+            data,
+            model=args.model,
+            cache_key=cache_keys["flow"],
+            max_input_tokens=args.max_input_tokens,
+            refresh=True
+        )
+    elif pending == ["std"]:
+        print("Analyzing...", file=sys.stderr)
+        results["std"] = analyze_session(
+            data,
+            model=args.model,
+            cache_key=cache_keys["std"],
+            max_input_tokens=args.max_input_tokens,
+            refresh=True
+        )
+
+    # Render
+    flow_output = None
+    if args.flow_and_md:
+        analysis = results["std"]
+        output = render_decision_log(data, analysis, audit=args.audit)
+        flow_output = render_flow_diagram(data, results["flow"])
+    elif args.flow:
+        analysis = results["flow"]
         output = render_flow_diagram(data, analysis)
     else:
-        print("Analyzing...", file=sys.stderr)
-        analysis = analyze_session(data, model=args.model)
+        analysis = results["std"]
         output = render_decision_log(data, analysis, audit=args.audit)
 
     if analysis:
@@ -151,19 +378,34 @@ def cmd_gen(args) -> int:
         copy_to_clipboard(output)
         print("Copied to clipboard", file=sys.stderr)
 
-    if args.flow:
+    if args.flow and not args.flow_and_md:
         # Flow outputs to stdout
-        print(output)
+        _write_stdout(output)
     else:
         # Markdown writes to file
         output_path = args.output or "trajectory.md"
-        with open(output_path, "w") as f:
-            f.write(output)
+        Path(output_path).write_bytes(output.encode("utf-8"))
         print(f"Written to {output_path}", file=sys.stderr)
 
+    if flow_output:
+        _write_stdout(flow_output)
+
     return 0
 
 
+def _write_stdout(text: str) -> None:
+    """Write text and a trailing newline to stdout as UTF-8, bypassing the text layer."""
+    buffer = getattr(sys.stdout, "buffer", None)
+    if buffer is None:
+        print(text)
+        return
+
+    sys.stdout.flush()
+    buffer.write(text.encode("utf-8"))
+    buffer.write(b"\n")
+    buffer.flush()
+
+
 def cmd_list(args) -> int:
     """List available sessions."""
     sessions = list_sessions(getattr(args, "project", None))
@@ -196,9 +438,14 @@ GEN OPTIONS
   -p, --project PATH   Project directory (default: current)
   -o, --output FILE    Output file (default: trajectory.md)
   --flow               ASCII flow diagram (outputs to stdout)
+  --flow-and-md        Write trajectory.md and print the flow diagram,
+                       running both analyses in parallel
   --audit              Full output with provenance labels
   --copy               Copy output to clipboard
   --model MODEL        Claude model (default: claude-sonnet-4-20250514)
+  --max-input-tokens N Token budget for the transcript (default: ~12500).
+                       Long sessions keep their start and end.
+  --no-cache           Ignore cached analysis and call the API again
 
 LIST OPTIONS
   -p, --project PATH   Project directory (default: current)
@@ -226,6 +473,7 @@ EXAMPLES
   trajectory gen --flow               ASCII diagram to stdout
   trajectory gen --flow > flow.txt    Save flow to file
   trajectory gen --flow --copy        Copy flow to clipboard
+  trajectory gen --flow-and-md        Markdown file + flow diagram in one run
   trajectory list                     Show available sessions
 
 WORKFLOW
@@ -233,6 +481,10 @@ WORKFLOW
   2. Run: trajectory gen
   3. Paste trajectory.md into your PR description
 
+CACHING
+  Analyses are cached in ~/.cache/trajectory, keyed by session content,
+  model, and output type. Re-running on an unchanged session skips the API.
+
 ENVIRONMENT
   ANTHROPIC_API_KEY    Required. Your Anthropic API key.
 
@@ -246,19 +498,94 @@ MORE INFO
 def copy_to_clipboard(text: str) -> None:
     """Copy text to system clipboard."""
     try:
-        if platform.system() == "Darwin":
-            subprocess.run(["pbcopy"], input=text.encode(), check=True)
-        elif platform.system() == "Linux":
-            # Try xclip first, fall back to xsel
-            try:
-                subprocess.run(["xclip", "-selection", "clipboard"], input=text.encode(), check=True)
-            except FileNotFoundError:
-                subprocess.run(["xsel", "--clipboard", "--input"], input=text.encode(), check=True)
-        else:  # Windows
-            subprocess.run(["clip"], input=text.encode(), check=True, shell=True)
-    except (subprocess.CalledProcessError, FileNotFoundError) as e:
+        if _SYSTEM == "Windows":
+            _copy_windows(text)
+        elif _CLIPBOARD_CMD:
+            _pipe_to_command(list(_CLIPBOARD_CMD), text)
+        else:
+            print("Warning: Could not copy to clipboard: install xclip or xsel", file=sys.stderr)
+    except (subprocess.CalledProcessError, OSError) as e:
         print(f"Warning: Could not copy to clipboard: {e}", file=sys.stderr)
 
 
+def _copy_windows(text: str) -> None:
+    """Put text on the Windows clipboard through the Win32 API.
+
+    Avoids spawning cmd.exe and clip.exe, and stores the text as
+    CF_UNICODETEXT so non-ASCII characters survive.
+    """
+    import ctypes
+    from ctypes import wintypes
+
+    CF_UNICODETEXT = 13
+    GMEM_MOVEABLE = 0x0002
+
+    user32 = ctypes.WinDLL("user32", use_last_error=True)
+    kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+    user32.OpenClipboard.argtypes = [wintypes.HWND]
+    user32.OpenClipboard.restype = wintypes.BOOL
+    user32.EmptyClipboard.restype = wintypes.BOOL
+    user32.SetClipboardData.argtypes = [wintypes.UINT, wintypes.HANDLE]
+    user32.SetClipboardData.restype = wintypes.HANDLE
+    user32.CloseClipboard.restype = wintypes.BOOL
+    kernel32.GlobalAlloc.argtypes = [wintypes.UINT, ctypes.c_size_t]
+    kernel32.GlobalAlloc.restype = wintypes.HGLOBAL
+    kernel32.GlobalLock.argtypes = [wintypes.HGLOBAL]
+    kernel32.GlobalLock.restype = wintypes.LPVOID
+    kernel32.GlobalUnlock.argtypes = [wintypes.HGLOBAL]
+    kernel32.GlobalFree.argtypes = [wintypes.HGLOBAL]
+
+    data = text.encode("utf-16-le") + b"\x00\x00"
+
+    if not user32.OpenClipboard(None):
+        raise ctypes.WinError(ctypes.get_last_error())
+    try:
+        user32.EmptyClipboard()
+        handle = kernel32.GlobalAlloc(GMEM_MOVEABLE, len(data))
+        if not handle:
+            raise ctypes.WinError(ctypes.get_last_error())
+
+        locked = kernel32.GlobalLock(handle)
+        if not locked:
+            kernel32.GlobalFree(handle)
+            raise ctypes.WinError(ctypes.get_last_error())
+        ctypes.memmove(locked, data, len(data))
+        kernel32.GlobalUnlock(handle)
+
+        # On success the clipboard owns the memory; otherwise free it
+        if not user32.SetClipboardData(CF_UNICODETEXT, handle):
+            kernel32.GlobalFree(handle)
+            raise ctypes.WinError(ctypes.get_last_error())
+    finally:
+        user32.CloseClipboard()
+
+
+# Characters encoded and written per chunk when piping to the clipboard
+_CLIPBOARD_CHUNK = 64 * 1024
+
+
+def _pipe_to_command(cmd: list, text: str) -> None:
+    """Write text to a command's stdin in chunks, without encoding it all at once.
+
+    Like subprocess.run(input=...), a command that exits without reading all
+    of its input is judged by its exit status, not by the broken pipe.
+    """
+    proc = subprocess.Popen(cmd, stdin=subprocess.PIPE)
+    try:
+        for i in range(0, len(text), _CLIPBOARD_CHUNK):
+            proc.stdin.write(text[i:i + _CLIPBOARD_CHUNK].encode())
+    except BrokenPipeError:
+        pass
+    finally:
+        try:
+            proc.stdin.close()
+        except BrokenPipeError:
+            pass
+        returncode = proc.wait()
+
+    if returncode:
+        raise subprocess.CalledProcessError(returncode, cmd)
+
+
 if __name__ == "__main__":
     sys.exit(main())
@@ -22,23 +22,64 @@ PROCESS_COMMANDS = [
     "go mod", "bundle ", "composer "
 ]
 
+# Git and package manager prefixes, bucketed by first character so a
+# command is only checked against the few prefixes that could match it
+_NON_CODE_PREFIXES = {
+    first: tuple(p for p in GIT_COMMANDS + PROCESS_COMMANDS if p[0] == first)
+    for first in {p[0] for p in GIT_COMMANDS + PROCESS_COMMANDS}
+}
+
+# Tools that always count as code-relevant
+_CODE_WRITE_TOOLS = frozenset({"Edit", "Write"})
+_CODE_READ_TOOLS = frozenset({"Grep", "Glob", "Read"})
+
+# Only this much of a command can take part in a prefix match
+_NON_CODE_PREFIX_LEN = max(len(p) for p in GIT_COMMANDS + PROCESS_COMMANDS)
+
+# Messages longer than this (once stripped) can't be a noise phrase
+_NOISE_PHRASE_LEN = max(len(p) for p in NOISE_PHRASES)
+
+_NOTIFICATION_PREFIXES = ("<task-notification", "<command-")
+_NOTIFICATION_PREFIX_LEN = max(len(p) for p in _NOTIFICATION_PREFIXES)
+
+
+# System-generated prompt prefixes, grouped by first character
+_SYSTEM_NOISE_PREFIXES = {
+    "<": ("<command-", "<task-"),
+    "B": ("Base directory for this skill",),
+    "#": ("# ",),
+}
+
 
 def is_noise_message(text: str) -> bool:
     """Check if a user message is noise (confirmation, short response, system message)."""
     if not text:
         return True
 
-    text_lower = text.lower().strip()
-
-    # Skip very short confirmations
-    if len(text_lower) < 20 and text_lower in NOISE_PHRASES:
+    # Skip system/task notifications without copying the (often long) text
+    if text.startswith(_NOTIFICATION_PREFIXES):
         return True
 
-    # Skip system/task notifications
-    if text_lower.startswith(("<task-notification", "<command-")):
+    if text[0].isspace() or text[-1].isspace():
+        text = text.strip()
+
+    # Skip short confirmations
+    if len(text) <= _NOISE_PHRASE_LEN and text.lower() in NOISE_PHRASES:
         return True
 
-    return False
+    # Skip system/task notifications with odd casing or leading whitespace;
+    # only the head of the text needs lowercasing for that
+    return text[:_NOTIFICATION_PREFIX_LEN].lower().startswith(_NOTIFICATION_PREFIXES)
+
+
+def could_be_noise_message(text: str) -> bool:
+    """Cheap screen for is_noise_message: False means text is certainly not noise.
+
+    Noise is either no longer than the longest noise phrase, starts with a
+    notification tag, or is padded with whitespace.
+    """
+    return (len(text) <= _NOISE_PHRASE_LEN or text[:1] == "<"
+            or text[:1].isspace() or text[-1:].isspace())
 
 
 def is_system_noise(text: str) -> bool:
@@ -46,36 +87,31 @@ def is_system_noise(text: str) -> bool:
     if not text:
         return True
 
-    return (
-        text.startswith("<command-") or
-        text.startswith("<task-") or
-        text.startswith("Base directory for this skill") or
-        text.startswith("# ") or
-        len(text.strip()) < 10
-    )
-
+    prefixes = _SYSTEM_NOISE_PREFIXES.get(text[0])
+    if prefixes and text.startswith(prefixes):
+        return True
 
-def is_code_relevant_tool(tool_call: ToolCall) -> bool:
-    """Check if a tool call is relevant to code decisions (not git/process)."""
-    if tool_call.name in ("Edit", "Write"):
+    if len(text) < 10:
         return True
 
-    if tool_call.name == "Bash":
-        cmd = tool_call.input.get("command", "").lower()
+    # Only whitespace padding can bring a longer text under the limit
+    if text[0].isspace() or text[-1].isspace():
+        return len(text.strip()) < 10
 
-        # Filter out git commands
-        for git_cmd in GIT_COMMANDS:
-            if cmd.startswith(git_cmd):
-                return False
+    return False
 
-        # Filter out package manager commands
-        for proc_cmd in PROCESS_COMMANDS:
-            if cmd.startswith(proc_cmd):
-                return False
 
+def is_code_relevant_tool(tool_call: ToolCall) -> bool:
+    """Check if a tool call is relevant to code decisions (not git/process)."""
+    name = tool_call.name
+    if name in _CODE_WRITE_TOOLS:
         return True
 
-    if tool_call.name in ("Grep", "Glob", "Read"):
-        return True
+    if name == "Bash":
+        cmd = tool_call.input.get("command", "")[:_NON_CODE_PREFIX_LEN].lower()
 
-    return False
+        # Filter out git and package manager commands
+        prefixes = _NON_CODE_PREFIXES.get(cmd[:1])
+        return not (prefixes and cmd.startswith(prefixes))
+
+    return name in _CODE_READ_TOOLS
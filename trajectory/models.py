@@ -1,10 +1,15 @@
 """Data models for trajectory session analysis."""
 
+import sys
 from dataclasses import dataclass, field
 from typing import Optional
 
+# Use __slots__ where supported (dataclass(slots=True) needs Python 3.10+):
+# smaller instances and faster attribute access for the many per-turn objects
+_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
 
-@dataclass
+
+@dataclass(**_SLOTS)
 class FileChange:
     """Represents a file modification during a session."""
     file_path: str
@@ -13,15 +18,19 @@ class FileChange:
     new_content: Optional[str] = None
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class ToolCall:
     """Represents a tool invocation during a session."""
     name: str
     input: dict
     timestamp: str
+    first_key: str = field(init=False, default="")  # first input key, for summaries
+
+    def __post_init__(self):
+        self.first_key = next(iter(self.input), "") if self.input else ""
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class ConversationTurn:
     """A single turn in the conversation."""
     role: str  # "user" or "assistant"
@@ -30,7 +39,7 @@ class ConversationTurn:
     tool_calls: list = field(default_factory=list)
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class SessionData:
     """Parsed data from a Claude Code session."""
     session_id: str
@@ -41,11 +50,16 @@ class SessionData:
     conversation: list = field(default_factory=list)
     tool_calls: list = field(default_factory=list)
     file_changes: list = field(default_factory=list)
+    # Per-file totals, path -> {"edits": int, "created": bool}, in first-change
+    # order. parse_session keys it by absolute path while reading and re-keys
+    # it relative to project_path before returning. Read it through
+    # parser.changed_files(), which falls back to file_changes when it's empty.
+    files_changed: dict = field(default_factory=dict)
     start_time: Optional[str] = None
     end_time: Optional[str] = None
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class AnalysisResult:
     """Structured analysis of a coding session.
 
@@ -1,12 +1,20 @@
 """Parse Claude Code session logs."""
 
+import functools
 import json
+import mmap
 import os
+import sys
 from pathlib import Path
 from typing import Optional
 
+try:
+    from orjson import loads as _json_loads
+except ImportError:
+    _json_loads = json.loads
+
 from .models import SessionData, FileChange, ToolCall, ConversationTurn
-from .filters import is_noise_message, is_code_relevant_tool
+from .filters import could_be_noise_message, is_noise_message, is_code_relevant_tool
 
 
 def get_claude_projects_dir() -> Path:
@@ -14,11 +22,36 @@ def get_claude_projects_dir() -> Path:
     return Path.home() / ".claude" / "projects"
 
 
+@functools.lru_cache(maxsize=32)
 def get_project_hash(cwd: str) -> str:
     """Convert a filesystem path to Claude's project hash format."""
     return cwd.replace("/", "-").lstrip("-")
 
 
+def _resolve_project_dir(project_path: str) -> Optional[Path]:
+    """Find the Claude Code project directory for a filesystem path.
+
+    Prefers the directory named with the exact project hash, then falls back
+    to the first one whose name contains, or is contained in, the hash.
+    """
+    projects_dir = get_claude_projects_dir()
+    project_hash = get_project_hash(project_path)
+
+    project_dir = projects_dir / project_hash
+    if project_dir.is_dir():
+        return project_dir
+
+    if not projects_dir.is_dir():
+        return None
+
+    # Try to find a matching project directory
+    for p in projects_dir.iterdir():
+        if p.is_dir() and (project_hash in p.name or p.name in project_hash):
+            return p
+
+    return None
+
+
 def find_latest_session(project_path: Optional[str] = None) -> Optional[Path]:
     """Find the most recent session file for a project.
 
@@ -28,32 +61,17 @@ def find_latest_session(project_path: Optional[str] = None) -> Optional[Path]:
     Returns:
         Path to the session JSONL file, or None if not found.
     """
-    projects_dir = get_claude_projects_dir()
-
-    if project_path:
-        project_hash = get_project_hash(project_path)
-    else:
-        project_hash = get_project_hash(os.getcwd())
-
-    project_dir = projects_dir / project_hash
-
-    if not project_dir.exists():
-        # Try to find a matching project directory
-        for p in projects_dir.iterdir():
-            if project_hash in p.name or p.name in project_hash:
-                project_dir = p
-                break
-
-    if not project_dir.exists():
+    project_dir = _resolve_project_dir(project_path or os.getcwd())
+    if not project_dir:
         return None
 
     # Find all session files and return the most recent
-    sessions = list(project_dir.glob("*.jsonl"))
+    sessions = _session_entries(project_dir)
     if not sessions:
         return None
 
-    sessions.sort(key=lambda x: x.stat().st_mtime, reverse=True)
-    return sessions[0]
+    latest = max(sessions, key=lambda e: e.stat().st_mtime)
+    return Path(latest.path)
 
 
 def resolve_session(session_id: str, project_path: Optional[str] = None) -> Optional[Path]:
@@ -66,24 +84,15 @@ def resolve_session(session_id: str, project_path: Optional[str] = None) -> Opti
     Returns:
         Path to the session JSONL file, or None if not found.
     """
-    projects_dir = get_claude_projects_dir()
-    project_path = project_path or os.getcwd()
-    project_hash = get_project_hash(project_path)
-
-    # Find matching project directory
-    project_dir = None
-    for p in projects_dir.iterdir():
-        if project_hash in p.name or p.name in project_hash:
-            project_dir = p
-            break
-
-    if not project_dir or not project_dir.exists():
+    project_dir = _resolve_project_dir(project_path or os.getcwd())
+    if not project_dir:
         return None
 
     # Find session file matching the ID
-    for session_file in project_dir.glob("*.jsonl"):
-        if session_file.stem.startswith(session_id) or session_id in session_file.stem:
-            return session_file
+    for entry in _session_entries(project_dir):
+        stem = entry.name[:-len(".jsonl")]
+        if stem.startswith(session_id) or session_id in stem:
+            return Path(entry.path)
 
     return None
 
@@ -94,32 +103,22 @@ def list_sessions(project_path: Optional[str] = None, limit: int = 20) -> list:
     Returns:
         List of dicts with session_id, modified, size_kb.
     """
-    projects_dir = get_claude_projects_dir()
-    project_path = project_path or os.getcwd()
-    project_hash = get_project_hash(project_path)
-
-    # Find matching project directory
-    project_dir = None
-    for p in projects_dir.iterdir():
-        if project_hash in p.name or p.name in project_hash:
-            project_dir = p
-            break
-
-    if not project_dir or not project_dir.exists():
+    project_dir = _resolve_project_dir(project_path or os.getcwd())
+    if not project_dir:
         return []
 
     sessions = sorted(
-        project_dir.glob("*.jsonl"),
-        key=lambda x: x.stat().st_mtime,
+        _session_entries(project_dir),
+        key=lambda e: e.stat().st_mtime,
         reverse=True
     )
 
     result = []
     for s in sessions[:limit]:
-        stat = s.stat()
+        stat = s.stat()  # cached on the DirEntry by the sort above
         result.append({
-            "session_id": s.stem,
-            "path": s,
+            "session_id": s.name[:-len(".jsonl")],
+            "path": Path(s.path),
             "modified": stat.st_mtime,
             "size_kb": stat.st_size / 1024
         })
@@ -127,6 +126,17 @@ def list_sessions(project_path: Optional[str] = None, limit: int = 20) -> list:
     return result
 
 
+def _session_entries(project_dir: Path) -> list:
+    """List the .jsonl files in a project directory as os.DirEntry objects.
+
+    DirEntry caches its stat() result, so sorting by mtime and then reading
+    the size costs one stat per file (none on Windows, where the directory
+    listing already includes it).
+    """
+    with os.scandir(project_dir) as it:
+        return [entry for entry in it if entry.name.endswith(".jsonl")]
+
+
 def parse_session(session_path: Path) -> SessionData:
     """Parse a session JSONL file and extract structured data.
 
@@ -144,19 +154,78 @@ def parse_session(session_path: Path) -> SessionData:
         git_branch=""
     )
 
-    with open(session_path, "r") as f:
-        for line in f:
+    for entry in iter_entries(session_path):
+        _process_entry(entry, data)
+
+    _relativize_changes(data)
+    return data
+
+
+def parse_sessions(session_paths: list) -> list:
+    """Parse several session files, in parallel across CPU cores.
+
+    Parsing is CPU-bound (JSON decoding), so each file is parsed in a worker
+    process. A single path is parsed in-process, skipping the pool start-up.
+
+    Args:
+        session_paths: Paths to .jsonl session files.
+
+    Returns:
+        List of SessionData, in the same order as session_paths.
+    """
+    session_paths = list(session_paths)
+    if len(session_paths) <= 1:
+        return [parse_session(path) for path in session_paths]
+
+    # Imported here: it pulls in multiprocessing, which CLI startup doesn't need
+    from concurrent.futures import ProcessPoolExecutor
+
+    max_workers = min(len(session_paths), os.cpu_count() or 1)
+    chunksize = max(1, len(session_paths) // (max_workers * 4))
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(parse_session, session_paths, chunksize=chunksize))
+
+
+def iter_entries(session_path: Path):
+    """Lazily read the entries of a session file.
+
+    Lines are read and decoded one at a time, so a consumer that stops early
+    (like stream_transcript once its budget is used up) never reads the rest
+    of the file. Blank and malformed lines are skipped.
+
+    Args:
+        session_path: Path to the .jsonl session file.
+
+    Yields:
+        Each decoded JSON entry, as a dict.
+    """
+    # Read bytes: both orjson and json.loads decode UTF-8 themselves
+    with open(session_path, "rb") as f:
+        for line in _iter_lines(f):
             if not line.strip():
                 continue
 
             try:
-                entry = json.loads(line)
-            except json.JSONDecodeError:
+                yield _json_loads(line)
+            except ValueError:  # JSONDecodeError, or invalid UTF-8
                 continue
 
-            _process_entry(entry, data)
 
-    return data
+def _iter_lines(f):
+    """Yield the lines of a binary file, through a memory map when possible.
+
+    Splitting lines out of the mapped file skips the buffered reader and
+    its intermediate copies. Empty files can't be mapped, nor can pipes and
+    the like, so those are read normally.
+    """
+    try:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (ValueError, OSError):
+        yield from f
+        return
+
+    with mm:
+        yield from iter(mm.readline, b"")
 
 
 def _process_entry(entry: dict, data: SessionData) -> None:
@@ -184,9 +253,25 @@ def _process_entry(entry: dict, data: SessionData) -> None:
 
 def _process_user_message(entry: dict, data: SessionData) -> None:
     """Extract user prompts from a message entry."""
+    timestamp = entry.get("timestamp", "")
+
+    combined_text = _user_text(entry)
+    if len(combined_text) > 5:
+        data.user_prompts.append({
+            "text": combined_text,
+            "timestamp": timestamp
+        })
+        data.conversation.append(ConversationTurn(
+            role="user",
+            text=combined_text,
+            timestamp=timestamp
+        ))
+
+
+def _user_text(entry: dict) -> str:
+    """Combine the text blocks of a user message entry."""
     message = entry.get("message", {})
     content = message.get("content", [])
-    timestamp = entry.get("timestamp", "")
 
     text_parts = []
     if isinstance(content, str):
@@ -196,30 +281,47 @@ def _process_user_message(entry: dict, data: SessionData) -> None:
             if isinstance(block, dict) and block.get("type") == "text":
                 text_parts.append(block.get("text", "").strip())
 
-    combined_text = "\n".join(t for t in text_parts if t)
-    if combined_text and len(combined_text) > 5:
-        data.user_prompts.append({
+    return "\n".join(t for t in text_parts if t)
+
+
+def _process_assistant_message(entry: dict, data: SessionData) -> None:
+    """Extract assistant responses and tool calls from a message entry."""
+    timestamp = entry.get("timestamp", "")
+
+    parts = _assistant_parts(entry)
+    if parts is None:
+        return
+    combined_text, tool_blocks = parts
+
+    turn_tool_calls = [_process_tool_call(block, timestamp, data) for block in tool_blocks]
+
+    if combined_text or turn_tool_calls:
+        data.assistant_responses.append({
             "text": combined_text,
+            "tool_calls": turn_tool_calls,
             "timestamp": timestamp
         })
         data.conversation.append(ConversationTurn(
-            role="user",
+            role="assistant",
             text=combined_text,
-            timestamp=timestamp
+            timestamp=timestamp,
+            tool_calls=turn_tool_calls
         ))
 
 
-def _process_assistant_message(entry: dict, data: SessionData) -> None:
-    """Extract assistant responses and tool calls from a message entry."""
+def _assistant_parts(entry: dict) -> Optional[tuple]:
+    """Split an assistant message entry into (combined text, tool_use blocks).
+
+    Returns None if the message content is not a list of blocks.
+    """
     message = entry.get("message", {})
     content = message.get("content", [])
-    timestamp = entry.get("timestamp", "")
 
     if not isinstance(content, list):
-        return
+        return None
 
     text_parts = []
-    turn_tool_calls = []
+    tool_blocks = []
 
     for block in content:
         if not isinstance(block, dict):
@@ -233,55 +335,109 @@ def _process_assistant_message(entry: dict, data: SessionData) -> None:
 
         # Extract tool calls
         if block.get("type") == "tool_use":
-            tool_call = _process_tool_call(block, timestamp, data)
-            if tool_call:
-                turn_tool_calls.append(tool_call)
-
-    combined_text = "\n".join(text_parts)
-    if combined_text or turn_tool_calls:
-        data.assistant_responses.append({
-            "text": combined_text,
-            "tool_calls": turn_tool_calls,
-            "timestamp": timestamp
-        })
-        data.conversation.append(ConversationTurn(
-            role="assistant",
-            text=combined_text,
-            timestamp=timestamp,
-            tool_calls=turn_tool_calls
-        ))
+            tool_blocks.append(block)
 
+    return "\n".join(text_parts), tool_blocks
 
-def _process_tool_call(block: dict, timestamp: str, data: SessionData) -> Optional[ToolCall]:
-    """Process a tool_use block and track file changes."""
-    tool_name = block.get("name", "")
-    tool_input = block.get("input", {})
 
-    tool_call = ToolCall(
-        name=tool_name,
-        input=tool_input,
+def _make_tool_call(block: dict, timestamp: str) -> ToolCall:
+    """Build a ToolCall from a tool_use block."""
+    # A session uses a handful of tool names thousands of times; interning
+    # shares one string per name and makes name comparisons identity hits
+    name = block.get("name", "")
+    if isinstance(name, str):
+        name = sys.intern(name)
+    return ToolCall(
+        name=name,
+        input=block.get("input", {}),
         timestamp=timestamp
     )
+
+
+def _process_tool_call(block: dict, timestamp: str, data: SessionData) -> ToolCall:
+    """Process a tool_use block and track file changes."""
+    tool_call = _make_tool_call(block, timestamp)
+    tool_name = tool_call.name
+    tool_input = tool_call.input
     data.tool_calls.append(tool_call)
 
-    # Track file changes
+    # Track file changes, and per-file totals for the renderers
     if tool_name == "Edit":
+        file_path = tool_input.get("file_path", "")
         data.file_changes.append(FileChange(
-            file_path=tool_input.get("file_path", ""),
+            file_path=file_path,
             change_type="edit",
             old_content=tool_input.get("old_string", ""),
             new_content=tool_input.get("new_string", "")
         ))
+        data.files_changed.setdefault(file_path, {"edits": 0, "created": False})["edits"] += 1
     elif tool_name == "Write":
+        file_path = tool_input.get("file_path", "")
         data.file_changes.append(FileChange(
-            file_path=tool_input.get("file_path", ""),
+            file_path=file_path,
             change_type="create",
             new_content=tool_input.get("content", "")
         ))
+        data.files_changed.setdefault(file_path, {"edits": 0, "created": False})["created"] = True
 
     return tool_call
 
 
+def _relativize_changes(data: SessionData) -> None:
+    """Make changed-file paths relative to the project, once per session.
+
+    project_path is only known after the first entry with a cwd, so this runs
+    after parsing: it re-keys files_changed by relative path, merging entries
+    that collapse together.
+    """
+    files_changed = {}
+    for file_path, counts in data.files_changed.items():
+        rel_path = _relativize_path(file_path, data.project_path)
+        info = files_changed.get(rel_path)
+        if info is None:
+            files_changed[rel_path] = counts
+        else:
+            info["edits"] += counts["edits"]
+            info["created"] = info["created"] or counts["created"]
+    data.files_changed = files_changed
+
+
+def changed_files(data: SessionData) -> dict:
+    """Per-file change totals for a session, keyed by project-relative path.
+
+    parse_session fills in data.files_changed as it goes. A SessionData built
+    or filtered by hand may only have file_changes, so when the dict is empty
+    the totals are aggregated from file_changes instead.
+
+    Returns:
+        Dict of path -> {"edits": int, "created": bool}, in first-change order.
+    """
+    if data.files_changed or not data.file_changes:
+        return data.files_changed
+
+    files_changed = {}
+    for change in data.file_changes:
+        rel_path = _relativize_path(change.file_path, data.project_path)
+        info = files_changed.setdefault(rel_path, {"edits": 0, "created": False})
+        if change.change_type == "create":
+            info["created"] = True
+        else:
+            info["edits"] += 1
+    return files_changed
+
+
+def _relativize_path(file_path: str, project_path: str) -> str:
+    """Make a file path relative to the project, if it lies under it.
+
+    Paths elsewhere (including sibling directories sharing the project's
+    name as a prefix) are returned unchanged.
+    """
+    prefix = project_path.rstrip("/") + "/" if project_path else ""
+    if prefix and file_path.startswith(prefix):
+        return file_path[len(prefix):]
+    return file_path
+
+
 def build_transcript(data: SessionData, max_length: int = 50000, code_focused: bool = True) -> str:
     """Build a readable transcript of the conversation for analysis.
 
@@ -293,44 +449,118 @@ def build_transcript(data: SessionData, max_length: int = 50000, code_focused: b
     Returns:
         Formatted transcript string.
     """
+    format_turn = _format_turn_code_focused if code_focused else _format_turn_raw
+    entries = (
+        format_turn(turn.role, turn.text, turn.tool_calls)
+        for turn in data.conversation
+    )
+    return _join_transcript(entries, max_length)
+
+
+def stream_transcript(
+    session_path: Path,
+    max_length: int = 50000,
+    code_focused: bool = True
+) -> str:
+    """Build a transcript straight from a session file.
+
+    Produces the same output as build_transcript(parse_session(path)), but
+    filters and formats each entry as it is read, without building a
+    SessionData, and stops reading once max_length is reached.
+
+    Args:
+        session_path: Path to the .jsonl session file.
+        max_length: Maximum transcript length in characters.
+        code_focused: If True, filter out noise and non-code-related content.
+
+    Returns:
+        Formatted transcript string.
+    """
+    format_turn = _format_turn_code_focused if code_focused else _format_turn_raw
+    entries = _stream_entries(session_path, format_turn)
+    try:
+        return _join_transcript(entries, max_length)
+    finally:
+        entries.close()  # close the file now if we stopped early
+
+
+def _stream_entries(session_path: Path, format_turn):
+    """Yield formatted transcript entries for each turn in a session file."""
+    for entry in iter_entries(session_path):
+        entry_type = entry.get("type")
+
+        if entry_type == "user":
+            text = _user_text(entry)
+            if len(text) > 5:
+                yield format_turn("user", text, [])
+
+        elif entry_type == "assistant":
+            parts = _assistant_parts(entry)
+            if parts is None:
+                continue
+            text, tool_blocks = parts
+            timestamp = entry.get("timestamp", "")
+            tool_calls = [_make_tool_call(block, timestamp) for block in tool_blocks]
+            if text or tool_calls:
+                yield format_turn("assistant", text, tool_calls)
+
+
+def _join_transcript(entries, max_length: int) -> str:
+    """Join formatted entries, stopping once max_length would be exceeded."""
     lines = []
     total_len = 0
 
-    for turn in data.conversation:
-        # Filter noise messages in code-focused mode
-        if code_focused and turn.role == "user" and is_noise_message(turn.text):
+    for entry in entries:
+        if not entry:
             continue
+        if total_len + len(entry) > max_length:
+            lines.append("... [transcript truncated] ...")
+            break
+        lines.append(entry)
+        total_len += len(entry)
 
-        prefix = "USER: " if turn.role == "user" else "ASSISTANT: "
-        text = turn.text[:2000] if turn.text else ""
-
-        # Include tool calls summary for assistant turns
-        if turn.role == "assistant" and turn.tool_calls:
-            if code_focused:
-                relevant_tools = [tc for tc in turn.tool_calls if is_code_relevant_tool(tc)]
-            else:
-                relevant_tools = turn.tool_calls
-
-            if relevant_tools:
-                tool_summary = ", ".join(
-                    f"{tc.name}({list(tc.input.keys())[0] if tc.input else ''})"
-                    for tc in relevant_tools[:5]
-                )
-                if len(relevant_tools) > 5:
-                    tool_summary += f", ... +{len(relevant_tools) - 5} more"
-                if text:
-                    text = f"{text}\n[Tools: {tool_summary}]"
-                else:
-                    text = f"[Tools: {tool_summary}]"
-            elif not text:
-                continue
+    return "\n".join(lines)
 
+
+def _format_turn_code_focused(role: str, text: str, tool_calls: list) -> str:
+    """Format a turn for a code-focused transcript, dropping noise and non-code tools."""
+    if role == "user":
+        # Most real prompts fail the cheap screen and skip is_noise_message
+        if could_be_noise_message(text) and is_noise_message(text):
+            return ""
+        return _format_entry("USER: ", text, ())
+
+    relevant_tools = [tc for tc in tool_calls if is_code_relevant_tool(tc)]
+    return _format_entry("ASSISTANT: ", text, relevant_tools)
+
+
+def _format_turn_raw(role: str, text: str, tool_calls: list) -> str:
+    """Format a turn for an unfiltered transcript."""
+    if role == "user":
+        return _format_entry("USER: ", text, ())
+    return _format_entry("ASSISTANT: ", text, tool_calls)
+
+
+def _format_entry(prefix: str, text: str, tools) -> str:
+    """Build a transcript entry with an optional tools summary ("" if empty)."""
+    if not text:
+        text = ""
+    elif len(text) > 2000:
+        text = text[:2000]
+
+    # Include tool calls summary
+    if tools:
+        tool_summary = ", ".join([
+            f"{tc.name}({tc.first_key})"
+            for tc in tools[:5]
+        ])
+        if len(tools) > 5:
+            tool_summary += f", ... +{len(tools) - 5} more"
         if text:
-            entry = f"{prefix}{text}\n"
-            if total_len + len(entry) > max_length:
-                lines.append("... [transcript truncated] ...")
-                break
-            lines.append(entry)
-            total_len += len(entry)
+            text = f"{text}\n[Tools: {tool_summary}]"
+        else:
+            text = f"[Tools: {tool_summary}]"
 
-    return "\n".join(lines)
+    if not text:
+        return ""
+    return f"{prefix}{text}\n"
@@ -1,9 +1,11 @@
 """Render session analysis to markdown."""
 
-from typing import Optional
+import io
+from typing import Callable, Optional
 
 from .models import SessionData, AnalysisResult
 from .filters import is_system_noise
+from .parser import changed_files
 
 
 def render_decision_log(
@@ -33,49 +35,54 @@ def render_decision_log(
     Returns:
         Markdown formatted decision log.
     """
-    lines = []
+    buf = io.StringIO()
+    write = buf.write
 
     # Header - branch name or generic title
     if data.git_branch:
-        lines.append(f"# {data.git_branch}")
+        write(f"# {data.git_branch}\n")
     else:
-        lines.append("# Decision Log")
-    lines.append("")
+        write("# Decision Log\n")
+    write("\n")
 
     # Intent
-    _render_intent(lines, data, analysis)
+    _render_intent(write, data, analysis)
 
     # Decisions (the main content)
     if analysis and analysis.decisions:
-        _render_decisions(lines, analysis, audit)
+        _render_decisions(write, analysis, audit)
 
     # Everything below is audit-only
     if audit:
         # Changed files
-        _render_changes(lines, data)
+        _render_changes(write, data)
 
         # Rejected alternatives
         if analysis and analysis.rejected:
-            _render_rejected(lines, analysis)
+            _render_rejected(write, analysis)
 
         # Assumptions
         if analysis and analysis.assumptions:
-            _render_assumptions(lines, analysis)
+            _render_assumptions(write, analysis)
 
         # Deferred items
         if analysis and analysis.deferred:
-            _render_deferred(lines, analysis)
+            _render_deferred(write, analysis)
 
     # Footer
-    _render_footer(lines, data, audit)
+    _render_footer(write, data, audit)
 
-    return "\n".join(lines)
+    return buf.getvalue()
 
 
-def _render_intent(lines: list, data: SessionData, analysis: Optional[AnalysisResult]) -> None:
+def _render_intent(
+    write: Callable[[str], int],
+    data: SessionData,
+    analysis: Optional[AnalysisResult]
+) -> None:
     """Render the intent section."""
     if analysis and analysis.intent:
-        lines.append(f"> {analysis.intent}")
+        write(f"> {analysis.intent}\n")
     elif data.user_prompts:
         # Find first real user prompt (skip system noise)
         primary = None
@@ -90,14 +97,14 @@ def _render_intent(lines: list, data: SessionData, analysis: Optional[AnalysisRe
 
         if len(primary) > 200:
             primary = primary[:200] + "..."
-        lines.append(f"> {primary}")
+        write(f"> {primary}\n")
 
-    lines.append("")
+    write("\n")
 
 
-def _render_decisions(lines: list, analysis: AnalysisResult, audit: bool) -> None:
+def _render_decisions(write: Callable[[str], int], analysis: AnalysisResult, audit: bool) -> None:
     """Render the decisions section."""
-    lines.append("**Decisions:**")
+    write("**Decisions:**\n")
     max_decisions = len(analysis.decisions) if audit else 2
 
     for item in analysis.decisions[:max_decisions]:
@@ -108,74 +115,65 @@ def _render_decisions(lines: list, analysis: AnalysisResult, audit: bool) -> Non
             context = item.get("context", "")
 
             if audit:
-                lines.append(f"- {decision}")
+                write(f"- {decision}\n")
                 if reasoning:
-                    lines.append(f"  {reasoning}")
+                    write(f"  {reasoning}\n")
                 if provenance or context:
                     badge_parts = []
                     if provenance:
                         badge_parts.append(f"`[{provenance}]`")
                     if context:
                         badge_parts.append(f"_{context}_")
-                    lines.append(f"  {' '.join(badge_parts)}")
+                    write(f"  {' '.join(badge_parts)}\n")
             else:
-                lines.append(f"- {decision}")
+                write(f"- {decision}\n")
         else:
-            lines.append(f"- {item}")
+            write(f"- {item}\n")
 
     if not audit and len(analysis.decisions) > 2:
         remaining = len(analysis.decisions) - 2
-        lines.append(f"  ... +{remaining} more (--audit)")
+        write(f"  ... +{remaining} more (--audit)\n")
 
-    lines.append("")
+    write("\n")
 
 
-def _render_changes(lines: list, data: SessionData) -> None:
+def _render_changes(write: Callable[[str], int], data: SessionData) -> None:
     """Render the files changed section (audit only)."""
-    if not data.file_changes:
+    files_changed = changed_files(data)
+    if not files_changed:
         return
 
-    files_changed = {}
-    for change in data.file_changes:
-        rel_path = _relativize_path(change.file_path, data.project_path)
-        if rel_path not in files_changed:
-            files_changed[rel_path] = {"edits": 0, "created": False}
-        if change.change_type == "create":
-            files_changed[rel_path]["created"] = True
-        else:
-            files_changed[rel_path]["edits"] += 1
-
-    lines.append("**Changed:**")
+    write("**Changed:**\n")
     for file_path, info in files_changed.items():
         if info["created"]:
-            lines.append(f"  `{file_path}` (new)")
+            write(f"  `{file_path}` (new)\n")
         else:
-            lines.append(f"  `{file_path}`")
+            write(f"  `{file_path}`\n")
 
-    lines.append("")
+    write("\n")
 
 
-def _render_rejected(lines: list, analysis: AnalysisResult) -> None:
+def _render_rejected(write: Callable[[str], int], analysis: AnalysisResult) -> None:
     """Render rejected alternatives section."""
-    lines.append("**Rejected:**")
+    write("**Rejected:**\n")
     for item in analysis.rejected:
         if isinstance(item, dict):
             alternative = item.get("alternative", "")
             reason = item.get("reason", "")
             context = item.get("context", "")
-            lines.append(f"- {alternative}")
+            write(f"- {alternative}\n")
             if reason:
-                lines.append(f"  {reason}")
+                write(f"  {reason}\n")
             if context:
-                lines.append(f"  _{context}_")
+                write(f"  _{context}_\n")
         else:
-            lines.append(f"- {item}")
-    lines.append("")
+            write(f"- {item}\n")
+    write("\n")
 
 
-def _render_assumptions(lines: list, analysis: AnalysisResult) -> None:
+def _render_assumptions(write: Callable[[str], int], analysis: AnalysisResult) -> None:
     """Render assumptions section."""
-    lines.append("**Assumptions:**")
+    write("**Assumptions:**\n")
     for item in analysis.assumptions:
         if isinstance(item, dict):
             assumption = item.get("assumption", "")
@@ -186,15 +184,15 @@ def _render_assumptions(lines: list, analysis: AnalysisResult) -> None:
                 line += f" `[{provenance}]`"
             if context:
                 line += f" _{context}_"
-            lines.append(line)
+            write(line + "\n")
         else:
-            lines.append(f"- {item}")
-    lines.append("")
+            write(f"- {item}\n")
+    write("\n")
 
 
-def _render_deferred(lines: list, analysis: AnalysisResult) -> None:
+def _render_deferred(write: Callable[[str], int], analysis: AnalysisResult) -> None:
     """Render deferred items section."""
-    lines.append("**Deferred:**")
+    write("**Deferred:**\n")
     for item in analysis.deferred:
         if isinstance(item, dict):
             deferred_item = item.get("item", "")
@@ -202,26 +200,58 @@ def _render_deferred(lines: list, analysis: AnalysisResult) -> None:
             line = f"- {deferred_item}"
             if context:
                 line += f" _{context}_"
-            lines.append(line)
+            write(line + "\n")
         else:
-            lines.append(f"- {item}")
-    lines.append("")
+            write(f"- {item}\n")
+    write("\n")
 
 
-def _render_footer(lines: list, data: SessionData, audit: bool) -> None:
-    """Render the footer with session reference."""
-    lines.append("---")
+def _render_footer(write: Callable[[str], int], data: SessionData, audit: bool) -> None:
+    """Render the footer with session reference (the log's last line, no newline)."""
+    write("---\n")
     if audit:
-        lines.append(f"_Session: {data.session_id}_")
+        write(f"_Session: {data.session_id}_")
     else:
-        lines.append(f"_Session: {data.session_id[:8]}_")
-
-
-def _relativize_path(file_path: str, project_path: str) -> str:
-    """Make file path relative to project."""
-    if project_path and file_path.startswith(project_path):
-        return file_path[len(project_path):].lstrip("/")
-    return file_path
+        write(f"_Session: {data.session_id[:8]}_")
+
+
+# Flow diagram layout: boxes are _BOX_W characters wide inside the borders.
+# Rows and borders are built once here rather than per line drawn.
+_BOX_W = 40
+_BOX_ROW_FMT = "  │ {:<%d} │" % (_BOX_W - 2)
+_BOX_BOTTOM = f"  └{'─' * _BOX_W}┘"
+_ARROW_STEM = f"{' ' * 20}│"
+_ARROW_HEAD = f"{' ' * 20}▼"
+_INTENT_TOP = f"  ┌─ INTENT {'─' * (_BOX_W - 10)}┐"
+_OUTPUT_TOP = f"  ┌─ OUTPUT {'─' * (_BOX_W - 9)}┐"
+_MORE_FILES_FMT = "  │ +{} more files{} │"
+_REJECTED_TOP = f"  ╳─ REJECTED {'─' * (_BOX_W - 12)}╳"
+_REJECTED_ROW_FMT = "  ╳ {:<%d} ╳" % (_BOX_W - 2)
+_REJECTED_BOTTOM = f"  ╳{'─' * _BOX_W}╳"
+_DEFERRED_TOP = f"  ──▷ DEFERRED {'─' * (_BOX_W - 13)}▷"
+_DEFERRED_ROW_FMT = "    ▷ {:<%d} ▷" % (_BOX_W - 4)
+_DEFERRED_BOTTOM = f"  ──▷{'─' * (_BOX_W - 2)}▷"
+
+# Map decision type to label
+_TYPE_LABELS = {
+    "directive": "DIRECTIVE",
+    "explicit": "DIRECTIVE",  # backwards compat
+    "choice": "CHOICE",
+    "chosen": "CHOICE",  # backwards compat
+    "implement": "IMPLEMENT",
+    "inferred": "IMPLEMENT",  # backwards compat
+}
+_DECISION_TOPS = {
+    label: f"  ┌─ {label} {'─' * (_BOX_W - len(label) - 3)}┐"
+    for label in ("DIRECTIVE", "CHOICE", "IMPLEMENT", "DECISION")
+}
+
+
+def _fit(text: str, width: int) -> str:
+    """Truncate text with an ellipsis so it fits in width characters."""
+    if len(text) > width:
+        return text[:width - 3] + "..."
+    return text
 
 
 def render_flow_diagram(
@@ -244,8 +274,7 @@ def render_flow_diagram(
     Returns:
         ASCII flow diagram.
     """
-    # Box width constants
-    W = 40  # inner width
+    W = _BOX_W
     lines = []
 
     # Header
@@ -257,24 +286,11 @@ def render_flow_diagram(
 
     # Intent at the top
     if analysis and analysis.intent:
-        intent = analysis.intent
-        if len(intent) > W - 2:
-            intent = intent[:W - 5] + "..."
-        lines.append(f"  ┌─ INTENT {'─' * (W - 10)}┐")
-        lines.append(f"  │ {intent:<{W - 2}} │")
-        lines.append(f"  └{'─' * W}┘")
-        lines.append(f"{' ' * 20}│")
-        lines.append(f"{' ' * 20}▼")
-
-    # Map type to label
-    type_labels = {
-        "directive": "DIRECTIVE",
-        "explicit": "DIRECTIVE",  # backwards compat
-        "choice": "CHOICE",
-        "chosen": "CHOICE",  # backwards compat
-        "implement": "IMPLEMENT",
-        "inferred": "IMPLEMENT",  # backwards compat
-    }
+        lines.append(_INTENT_TOP)
+        lines.append(_BOX_ROW_FMT.format(_fit(analysis.intent, W - 2)))
+        lines.append(_BOX_BOTTOM)
+        lines.append(_ARROW_STEM)
+        lines.append(_ARROW_HEAD)
 
     # Decisions flow
     if analysis and analysis.decisions:
@@ -284,93 +300,68 @@ def render_flow_diagram(
             if isinstance(item, dict):
                 decision = item.get("decision", "")
                 dec_type = item.get("type", item.get("provenance", ""))
-                label = type_labels.get(dec_type, "DECISION")
-
-                # Truncate
-                if len(decision) > W - 2:
-                    decision = decision[:W - 5] + "..."
-
-                # Draw decision box
-                header = f"─ {label} "
-                lines.append(f"  ┌{header}{'─' * (W - len(header))}┐")
-                lines.append(f"  │ {decision:<{W - 2}} │")
-                lines.append(f"  └{'─' * W}┘")
+                label = _TYPE_LABELS.get(dec_type, "DECISION")
             else:
                 decision = str(item)
-                if len(decision) > W - 2:
-                    decision = decision[:W - 5] + "..."
-                lines.append(f"  ┌─ DECISION {'─' * (W - 11)}┐")
-                lines.append(f"  │ {decision:<{W - 2}} │")
-                lines.append(f"  └{'─' * W}┘")
+                label = "DECISION"
+
+            # Draw decision box
+            lines.append(_DECISION_TOPS[label])
+            lines.append(_BOX_ROW_FMT.format(_fit(decision, W - 2)))
+            lines.append(_BOX_BOTTOM)
 
             if not is_last:
-                lines.append(f"{' ' * 20}│")
-                lines.append(f"{' ' * 20}▼")
+                lines.append(_ARROW_STEM)
+                lines.append(_ARROW_HEAD)
 
     # Files changed (output)
-    if data.file_changes:
-        lines.append(f"{' ' * 20}│")
-        lines.append(f"{' ' * 20}▼")
-        lines.append(f"  ┌─ OUTPUT {'─' * (W - 9)}┐")
+    changed = changed_files(data)
+    if changed:
+        lines.append(_ARROW_STEM)
+        lines.append(_ARROW_HEAD)
+        lines.append(_OUTPUT_TOP)
 
         files_changed = {}
-        for change in data.file_changes:
-            rel_path = _relativize_path(change.file_path, data.project_path)
+        for file_path, counts in changed.items():
             # Just use filename
-            filename = rel_path.split("/")[-1]
-            if filename not in files_changed:
-                files_changed[filename] = {"edits": 0, "created": False}
-            if change.change_type == "create":
-                files_changed[filename]["created"] = True
-            else:
-                files_changed[filename]["edits"] += 1
+            filename = file_path.split("/")[-1]
+            info = files_changed.setdefault(filename, {"edits": 0, "created": False})
+            info["edits"] += counts["edits"]
+            info["created"] = info["created"] or counts["created"]
 
         for filename, info in list(files_changed.items())[:4]:
             label = "(new)" if info["created"] else f"({info['edits']} edit{'s' if info['edits'] > 1 else ''})"
-            display = f"{filename} {label}"
-            if len(display) > W - 2:
-                display = display[:W - 5] + "..."
-            lines.append(f"  │ {display:<{W - 2}} │")
+            lines.append(_BOX_ROW_FMT.format(_fit(f"{filename} {label}", W - 2)))
 
         if len(files_changed) > 4:
             remaining = len(files_changed) - 4
-            lines.append(f"  │ +{remaining} more files{' ' * (W - 14 - len(str(remaining)))} │")
+            lines.append(_MORE_FILES_FMT.format(remaining, " " * (W - 14 - len(str(remaining)))))
 
-        lines.append(f"  └{'─' * W}┘")
+        lines.append(_BOX_BOTTOM)
 
     # Rejected alternatives
     if analysis and analysis.rejected:
         lines.append("")
-        lines.append(f"  ╳─ REJECTED {'─' * (W - 12)}╳")
+        lines.append(_REJECTED_TOP)
         for item in analysis.rejected:
             if isinstance(item, dict):
-                alt = item.get("alternative", "")
-                if len(alt) > W - 2:
-                    alt = alt[:W - 5] + "..."
-                lines.append(f"  ╳ {alt:<{W - 2}} ╳")
+                text = item.get("alternative", "")
             else:
                 text = str(item)
-                if len(text) > W - 2:
-                    text = text[:W - 5] + "..."
-                lines.append(f"  ╳ {text:<{W - 2}} ╳")
-        lines.append(f"  ╳{'─' * W}╳")
+            lines.append(_REJECTED_ROW_FMT.format(_fit(text, W - 2)))
+        lines.append(_REJECTED_BOTTOM)
 
     # Deferred (pushed aside)
     if analysis and analysis.deferred:
         lines.append("")
-        lines.append(f"  ──▷ DEFERRED {'─' * (W - 13)}▷")
+        lines.append(_DEFERRED_TOP)
         for item in analysis.deferred:
             if isinstance(item, dict):
-                deferred_item = item.get("item", "")
-                if len(deferred_item) > W - 4:
-                    deferred_item = deferred_item[:W - 7] + "..."
-                lines.append(f"    ▷ {deferred_item:<{W - 4}} ▷")
+                text = item.get("item", "")
             else:
                 text = str(item)
-                if len(text) > W - 4:
-                    text = text[:W - 7] + "..."
-                lines.append(f"    ▷ {text:<{W - 4}} ▷")
-        lines.append(f"  ──▷{'─' * (W - 2)}▷")
+            lines.append(_DEFERRED_ROW_FMT.format(_fit(text, W - 4)))
+        lines.append(_DEFERRED_BOTTOM)
 
     # Footer
     lines.append("")